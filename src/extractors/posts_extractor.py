@@ -31,6 +31,7 @@ class PostsExtractor:
         params = params or {}
         attempt = 0
         last_exception: Optional[Exception] = None
+        client_error: Optional[requests.HTTPError] = None
 
         while attempt <= self.max_retries:
             try:
@@ -43,6 +44,12 @@ class PostsExtractor:
                     response.url,
                     response.text[:500],
                 )
+                # Client errors such as 404 for an unknown account will not succeed on retry
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    client_error = requests.HTTPError(
+                        f"HTTP {response.status_code} from {response.url}", response=response
+                    )
+                    break
             except (requests.RequestException, ValueError) as exc:
                 last_exception = exc
                 self.logger.warning(
@@ -54,16 +61,24 @@ class PostsExtractor:
                 sleep_for = self.backoff_factor * (2 ** (attempt - 1))
                 time.sleep(sleep_for)
 
+        if client_error:
+            raise client_error
         if last_exception:
             raise last_exception
         raise RuntimeError(f"Failed to fetch data from {url} after {self.max_retries} retries")
 
-    def fetch_posts(self, account_id: str, limit: int = 40) -> List[Dict[str, Any]]:
+    def fetch_posts(
+        self,
+        account_id: str,
+        limit: int = 40,
+        raise_on_error: bool = False,
+    ) -> List[Dict[str, Any]]:
         """
         Fetch original posts for an account, excluding replies.
 
         :param account_id: Truth Social internal account ID
         :param limit: Maximum number of posts to fetch
+        :param raise_on_error: Propagate transient request errors instead of returning an empty list
         """
         url = f"{self.base_url}/api/v1/accounts/{account_id}/statuses"
         params: Dict[str, Any] = {
@@ -76,7 +91,12 @@ class PostsExtractor:
 
         try:
             payload = self._request(url, params=params)
+        except requests.HTTPError as exc:
+            self.logger.error("Failed to fetch posts for account_id=%s: %s", account_id, exc)
+            return []
         except Exception as exc:
+            if raise_on_error:
+                raise
             self.logger.error("Failed to fetch posts for account_id=%s: %s", account_id, exc)
             return []
 
@@ -67,6 +67,7 @@ class ProfileExtractor:
         params = params or {}
         attempt = 0
         last_exception: Optional[Exception] = None
+        client_error: Optional[requests.HTTPError] = None
 
         while attempt <= self.max_retries:
             try:
@@ -79,6 +80,12 @@ class ProfileExtractor:
                     response.url,
                     response.text[:500],
                 )
+                # Client errors such as 404 for an unknown account will not succeed on retry
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    client_error = requests.HTTPError(
+                        f"HTTP {response.status_code} from {response.url}", response=response
+                    )
+                    break
             except (requests.RequestException, ValueError) as exc:
                 last_exception = exc
                 self.logger.warning(
@@ -90,15 +97,23 @@ class ProfileExtractor:
                 sleep_for = self.backoff_factor * (2 ** (attempt - 1))
                 time.sleep(sleep_for)
 
+        if client_error:
+            raise client_error
         if last_exception:
             raise last_exception
         raise RuntimeError(f"Failed to fetch data from {url} after {self.max_retries} retries")
 
-    def fetch_profile(self, identifier: str) -> Optional[Dict[str, Any]]:
+    def fetch_profile(
+        self,
+        identifier: str,
+        raise_on_error: bool = False,
+    ) -> Optional[Dict[str, Any]]:
         """
         Fetch a single profile by username or URL.
 
         Returns a JSON-like dict if successful, otherwise None.
+        Transient request errors are re-raised when raise_on_error is set;
+        client errors such as 404 always return None.
         """
         username = self._extract_username(identifier)
         if not username:
@@ -111,7 +126,12 @@ class ProfileExtractor:
 
         try:
             profile = self._request(url, params=params)
+        except requests.HTTPError as exc:
+            self.logger.error("Failed to fetch profile '%s': %s", username, exc)
+            return None
         except Exception as exc:
+            if raise_on_error:
+                raise
             self.logger.error("Failed to fetch profile '%s': %s", username, exc)
             return None
 
@@ -0,0 +1,215 @@
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+class CircuitBreaker:
+    """
+    Tracks the recent error rate of a single endpoint and stops traffic to it
+    once too many requests fail.
+
+    States follow the usual closed -> open -> half-open cycle: while open, no
+    requests are allowed until the cooldown elapses; the first request after
+    that is a probe whose outcome either closes or re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_requests: int = 5,
+        failure_ratio: float = 0.5,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.name = name
+        self.min_requests = max(1, min_requests)
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=max(self.min_requests, window_size))
+        self._opened_at = 0.0
+        self._clock = clock
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if self._clock() < self.retry_at():
+                return False
+            self.state = self.HALF_OPEN
+            self.logger.info("Circuit for %s half-open; sending probe request", self.name)
+        return True
+
+    def retry_at(self) -> float:
+        """
+        Clock time at which an open breaker will let a probe request through.
+        """
+        return self._opened_at + self.cooldown
+
+    def record_success(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self.logger.info("Circuit for %s closed after successful probe", self.name)
+            self.state = self.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if (
+            self.state == self.CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and failures / len(self._outcomes) >= self.failure_ratio
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.logger.warning(
+            "Circuit for %s opened; pausing requests for %.1fs", self.name, self.cooldown
+        )
+
+class _Task:
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        func: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        self.name = name
+        self.endpoint = endpoint
+        self.func = func
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.attempt = 0
+
+class RetryScheduler:
+    """
+    Runs fetch tasks from a delay queue so that a failing task is rescheduled
+    with exponential backoff instead of blocking the tasks queued behind it.
+
+    The scheduler only sleeps when no task is ready to run. Each endpoint gets
+    its own CircuitBreaker; tasks hitting an open breaker are deferred until
+    it half-opens, which consumes a retry attempt so that a hard-down endpoint
+    fails its tasks in bounded time.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        breaker_settings: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.breaker_settings = breaker_settings or {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._queue: List[Tuple[float, int, _Task]] = []
+        self._counter = itertools.count()
+        self._clock = clock
+        self._sleep = sleep
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def schedule(
+        self,
+        name: str,
+        endpoint: str,
+        func: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        """
+        Queue a task to run as soon as possible.
+
+        :param name: Human-readable label used in log messages
+        :param endpoint: Key selecting the circuit breaker guarding this task
+        :param func: Callable performing a single fetch attempt; raises on failure
+        :param on_success: Called with the return value of func; may schedule more tasks
+        :param on_failure: Called with the last error once all retries are exhausted
+        """
+        self._push(_Task(name, endpoint, func, on_success, on_failure), self._clock())
+
+    def _push(self, task: _Task, ready_at: float) -> None:
+        heapq.heappush(self._queue, (ready_at, next(self._counter), task))
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, clock=self._clock, **self.breaker_settings)
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    def _callback(self, task: _Task, callback: Callable[[Any], None], value: Any) -> None:
+        # A failing callback must not abort the run and drop the remaining tasks
+        try:
+            callback(value)
+        except Exception as exc:
+            self.logger.exception("Unexpected error while handling %s: %s", task.name, exc)
+
+    def run(self) -> None:
+        """
+        Process queued tasks until the queue is empty.
+        """
+        while self._queue:
+            ready_at, _, task = heapq.heappop(self._queue)
+            wait = ready_at - self._clock()
+            if wait > 0:
+                self._sleep(wait)
+
+            breaker = self._breaker(task.endpoint)
+            if not breaker.allow_request():
+                task.attempt += 1
+                if task.attempt > self.max_retries:
+                    self.logger.error(
+                        "Giving up on %s after %s attempts: circuit for %s is open",
+                        task.name,
+                        task.attempt,
+                        task.endpoint,
+                    )
+                    error = RuntimeError(f"Circuit for {task.endpoint} is open")
+                    self._callback(task, task.on_failure, error)
+                    continue
+                self._push(task, breaker.retry_at())
+                continue
+
+            try:
+                result = task.func()
+            except Exception as exc:
+                breaker.record_failure()
+                task.attempt += 1
+                if task.attempt > self.max_retries:
+                    self.logger.error(
+                        "Giving up on %s after %s attempts: %s", task.name, task.attempt, exc
+                    )
+                    self._callback(task, task.on_failure, exc)
+                    continue
+                delay = self.backoff_factor * (2 ** (task.attempt - 1))
+                self.logger.warning(
+                    "Attempt %s for %s failed (%s); retrying in %.1fs",
+                    task.attempt,
+                    task.name,
+                    exc,
+                    delay,
+                )
+                self._push(task, self._clock() + delay)
+                continue
+
+            breaker.record_success()
+            self._callback(task, task.on_success, result)
@@ -3,7 +3,7 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 # Ensure project root is on sys.path so we can import src.* as a namespace package
 CURRENT_FILE = Path(__file__).resolve()
@@ -14,12 +14,15 @@ if str(PROJECT_ROOT) not in sys.path:
 from src.extractors.profile_extractor import ProfileExtractor  # type: ignore  # noqa: E402
 from src.extractors.posts_extractor import PostsExtractor  # type: ignore  # noqa: E402
 from src.extractors.replies_extractor import RepliesExtractor  # type: ignore  # noqa: E402
+from src.extractors.retry_scheduler import RetryScheduler  # type: ignore  # noqa: E402
 from src.outputs.data_formatter import (  # type: ignore  # noqa: E402
     format_post,
     format_profile,
     format_reply,
+    write_dead_letters,
     write_json,
 )
+from src.outputs.near_duplicates import NearDuplicateIndex  # type: ignore  # noqa: E402
 
 def load_settings() -> Dict[str, Any]:
     config_path = CURRENT_FILE.parent / "config" / "settings.json"
@@ -68,6 +71,14 @@ def parse_args() -> argparse.Namespace:
         "-o",
         help="Path to output JSON file. Defaults to data/output_<timestamp>.json inside the project.",
     )
+    parser.add_argument(
+        "--dead-letter",
+        help="Path to write inputs that failed after all retries, usable as --input-file. Defaults to data/dead_letter_<timestamp>.txt inside the project.",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        help="Path to a persisted MinHash/LSH index. When set, each post and reply gets a nearDuplicateOf cluster ID and the index is updated.",
+    )
     return parser.parse_args()
 
 def load_inputs(args: argparse.Namespace) -> List[str]:
@@ -97,6 +108,16 @@ def build_output_path(args: argparse.Namespace, settings: Dict[str, Any]) -> Pat
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     return output_dir / f"output_{timestamp}.json"
 
+def build_dead_letter_path(args: argparse.Namespace, settings: Dict[str, Any]) -> Path:
+    if args.dead_letter:
+        return Path(args.dead_letter).resolve()
+    from datetime import datetime
+
+    output_dir_setting = settings.get("output_dir", "data")
+    output_dir = PROJECT_ROOT / output_dir_setting
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    return output_dir / f"dead_letter_{timestamp}.txt"
+
 def main() -> None:
     settings = load_settings()
     configure_logging(settings.get("log_level", "INFO"))
@@ -115,70 +136,162 @@ def main() -> None:
     max_retries = settings.get("max_retries", 3)
     backoff_factor = settings.get("backoff_factor", 0.5)
 
+    # Extractors make a single attempt per call; retries are rescheduled on the
+    # scheduler's delay queue so one failing account does not stall the others.
     profile_extractor = ProfileExtractor(
         base_url=base_url,
         timeout=timeout,
-        max_retries=max_retries,
-        backoff_factor=backoff_factor,
+        max_retries=0,
     )
     posts_extractor = PostsExtractor(
         base_url=base_url,
         timeout=timeout,
-        max_retries=max_retries,
-        backoff_factor=backoff_factor,
+        max_retries=0,
     )
     replies_extractor = RepliesExtractor(
         base_url=base_url,
         timeout=timeout,
+        max_retries=0,
+    )
+    scheduler = RetryScheduler(
         max_retries=max_retries,
         backoff_factor=backoff_factor,
+        breaker_settings={
+            "window_size": settings.get("circuit_window_size", 20),
+            "min_requests": settings.get("circuit_min_requests", 5),
+            "failure_ratio": settings.get("circuit_failure_ratio", 0.5),
+            "cooldown": settings.get("circuit_cooldown", 30),
+        },
     )
 
-    results: List[Dict[str, Any]] = []
+    # Tasks for different inputs complete out of order, so results are
+    # collected per input and flattened in input order at the end.
+    collected: List[Dict[str, List[Dict[str, Any]]]] = [
+        {"profile": [], "posts": [], "replies": []} for _ in inputs
+    ]
+    failed_indexes: Set[int] = set()
 
-    for input_value in inputs:
-        logger.info("Processing input: %s", input_value)
-        try:
-            raw_profile: Optional[Dict[str, Any]] = None
-            if args.mode in ("profile", "posts", "replies", "all"):
-                raw_profile = profile_extractor.fetch_profile(input_value)
-                if raw_profile is None:
-                    logger.warning("No profile data found for input: %s", input_value)
-                    continue
-
-            if args.mode in ("profile", "all"):
-                profile_obj = format_profile(raw_profile, input_value)
-                results.append(profile_obj)
-
-            account_id = raw_profile.get("id") if raw_profile else None
-            username = raw_profile.get("username") if raw_profile else None
-
-            if not account_id or not username:
-                if args.mode in ("posts", "replies", "all"):
-                    logger.warning(
-                        "Account ID or username missing for input %s; skipping posts/replies.",
-                        input_value,
-                    )
-                continue
+    def on_failure(index: int) -> Callable[[Exception], None]:
+        def handle(exc: Exception) -> None:
+            failed_indexes.add(index)
 
-            if args.mode in ("posts", "all"):
-                raw_posts = posts_extractor.fetch_posts(account_id=account_id, limit=args.limit)
-                for post in raw_posts:
-                    results.append(format_post(post, username=username, account_id=account_id))
+        return handle
 
-            if args.mode in ("replies", "all"):
-                raw_replies = replies_extractor.fetch_replies(
-                    account_id=account_id, limit=args.limit
+    def schedule_statuses(index: int, input_value: str, raw_profile: Dict[str, Any]) -> None:
+        account_id = raw_profile.get("id")
+        username = raw_profile.get("username")
+
+        if not account_id or not username:
+            if args.mode in ("posts", "replies", "all"):
+                logger.warning(
+                    "Account ID or username missing for input %s; skipping posts/replies.",
+                    input_value,
                 )
+            return
+
+        if args.mode in ("posts", "all"):
+
+            def on_posts(raw_posts: List[Dict[str, Any]]) -> None:
+                for post in raw_posts:
+                    collected[index]["posts"].append(
+                        format_post(post, username=username, account_id=account_id)
+                    )
+
+            scheduler.schedule(
+                name=f"posts for {input_value}",
+                endpoint="statuses",
+                func=lambda: posts_extractor.fetch_posts(
+                    account_id=account_id, limit=args.limit, raise_on_error=True
+                ),
+                on_success=on_posts,
+                on_failure=on_failure(index),
+            )
+
+        if args.mode in ("replies", "all"):
+
+            def on_replies(raw_replies: List[Dict[str, Any]]) -> None:
                 for reply in raw_replies:
-                    results.append(
+                    collected[index]["replies"].append(
                         format_reply(reply, username=username, account_id=account_id)
                     )
 
+            scheduler.schedule(
+                name=f"replies for {input_value}",
+                endpoint="statuses",
+                func=lambda: replies_extractor.fetch_replies(
+                    account_id=account_id, limit=args.limit, raise_on_error=True
+                ),
+                on_success=on_replies,
+                on_failure=on_failure(index),
+            )
+
+    def schedule_profile(index: int, input_value: str) -> None:
+        def on_profile(raw_profile: Optional[Dict[str, Any]]) -> None:
+            if raw_profile is None:
+                logger.warning("No profile data found for input: %s", input_value)
+                return
+            try:
+                if args.mode in ("profile", "all"):
+                    collected[index]["profile"].append(format_profile(raw_profile, input_value))
+                schedule_statuses(index, input_value, raw_profile)
+            except Exception as exc:
+                logger.exception(
+                    "Unexpected error while processing input %s: %s", input_value, exc
+                )
+
+        logger.info("Processing input: %s", input_value)
+        scheduler.schedule(
+            name=f"profile for {input_value}",
+            endpoint="lookup",
+            func=lambda: profile_extractor.fetch_profile(input_value, raise_on_error=True),
+            on_success=on_profile,
+            on_failure=on_failure(index),
+        )
+
+    for index, input_value in enumerate(inputs):
+        schedule_profile(index, input_value)
+
+    scheduler.run()
+
+    results: List[Dict[str, Any]] = []
+    for index, bucket in enumerate(collected):
+        # Dead-lettered inputs are re-scraped in full, so their partial results
+        # are dropped to avoid duplicate records across runs.
+        if index in failed_indexes:
+            continue
+        results.extend(bucket["profile"])
+        results.extend(bucket["posts"])
+        results.extend(bucket["replies"])
+
+    if args.near_duplicates and results:
+        index_path = Path(args.near_duplicates).resolve()
+        try:
+            near_duplicates = NearDuplicateIndex(
+                index_path,
+                num_perm=settings.get("minhash_num_perm", 128),
+                bands=settings.get("lsh_bands", 16),
+                threshold=settings.get("near_duplicate_threshold", 0.7),
+                min_tokens=settings.get("near_duplicate_min_tokens", 5),
+            )
+            try:
+                for record in results:
+                    if record.get("type") in ("post", "reply"):
+                        near_duplicates.assign(record)
+                near_duplicates.save()
+                logger.info("Near-duplicate index updated at %s", index_path)
+            finally:
+                near_duplicates.close()
         except Exception as exc:
-            logger.exception(
-                "Unexpected error while processing input %s: %s", input_value, exc
+            logger.error("Failed to update near-duplicate index: %s", exc)
+
+    if failed_indexes:
+        dead_letter_path = build_dead_letter_path(args, settings)
+        try:
+            write_dead_letters(
+                [inputs[index] for index in sorted(failed_indexes)], dead_letter_path
             )
+        except Exception as exc:
+            logger.error("Failed to write dead-letter file: %s", exc)
 
     if not results:
         logger.warning("No data was collected; exiting without writing output.")
@@ -154,4 +154,16 @@ def write_json(data: Any, output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
     logger.info("Writing %s records to %s", len(data) if isinstance(data, list) else "N/A", output_path)
     with output_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def write_dead_letters(inputs: List[str], output_path: Path) -> None:
+    """
+    Write inputs that could not be scraped, one per line, so the file can be
+    passed back through --input-file.
+    """
+    output_path = output_path.resolve()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.warning("Writing %s failed inputs to %s", len(inputs), output_path)
+    with output_path.open("w", encoding="utf-8") as f:
+        for value in inputs:
+            f.write(f"{value}\n")
@@ -0,0 +1,246 @@
+import hashlib
+import html
+import json
+import logging
+import random
+import re
+import sqlite3
+import struct
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        # Block-level tags separate words that would otherwise run together
+        if tag in {"br", "p", "div", "li"}:
+            self.parts.append(" ")
+
+    def handle_data(self, data: str) -> None:
+        self.parts.append(data)
+
+def normalize_content(content: Optional[str]) -> str:
+    """
+    Strip HTML from a status content field and normalize it for comparison:
+    lowercase, punctuation removed, whitespace collapsed.
+    """
+    if not content:
+        return ""
+    parser = _TextExtractor()
+    parser.feed(content)
+    parser.close()
+    text = html.unescape("".join(parser.parts)).lower()
+    return " ".join(_TOKEN_RE.findall(text))
+
+def _shingles(text: str, size: int) -> List[str]:
+    tokens = text.split()
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+
+def _hash_bytes(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=4).digest(), "big")
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index assigning near-duplicate cluster IDs to statuses.
+
+    Each status is reduced to a MinHash signature over word shingles of its
+    normalized text. Signatures are split into bands; statuses sharing any band
+    bucket are candidates, and a candidate cluster is accepted when the estimated
+    Jaccard similarity to its representative meets the threshold. Only one
+    signature per cluster is kept, so lookups cost the same regardless of how
+    many statuses have been indexed.
+
+    Clusters and band buckets are stored in SQLite so each status only needs
+    point lookups and inserts. Changes are committed by save(); an interrupted
+    run leaves the previously saved index intact.
+
+    The cluster ID is the status ID of the first status seen in the cluster.
+    Statuses with fewer than min_tokens words (e.g. "Wow" or "Thank you") are
+    not indexed, since short stock phrases would otherwise form huge clusters.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.7,
+        shingle_size: int = 3,
+        min_tokens: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self.seed = seed
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        try:
+            self._init_schema(path)
+        except Exception:
+            self._conn.close()
+            raise
+
+    def _init_schema(self, path: Union[str, Path]) -> None:
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS clusters (id TEXT PRIMARY KEY, signature BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                cluster_id TEXT NOT NULL,
+                PRIMARY KEY (band, key)
+            );
+            """
+        )
+        params = self._params()
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+        if row is None:
+            self._conn.execute(
+                "INSERT INTO meta (name, value) VALUES ('params', ?)", (json.dumps(params),)
+            )
+            self._conn.commit()
+        elif json.loads(row[0]) != params:
+            raise ValueError(
+                f"Near-duplicate index at {path} was built with parameters "
+                f"{row[0]}, expected {json.dumps(params)}"
+            )
+
+    def signature(self, text: str) -> Optional[List[int]]:
+        """
+        Compute the MinHash signature of normalized text, or None if it has
+        fewer than min_tokens words.
+        """
+        if len(text.split()) < max(1, self.min_tokens):
+            return None
+        shingles = _shingles(text, self.shingle_size)
+        if not shingles:
+            return None
+        hashed = [_hash_bytes(s.encode("utf-8")) for s in set(shingles)]
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed)
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, signature: List[int]) -> List[str]:
+        keys: List[str] = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                b"".join(v.to_bytes(4, "big") for v in rows), digest_size=8
+            )
+            keys.append(digest.hexdigest())
+        return keys
+
+    def _similarity(self, left: List[int], right: List[int]) -> float:
+        return sum(1 for a, b in zip(left, right) if a == b) / self.num_perm
+
+    def _pack(self, signature: List[int]) -> bytes:
+        return struct.pack(f">{self.num_perm}I", *signature)
+
+    def _unpack(self, blob: bytes) -> List[int]:
+        return list(struct.unpack(f">{self.num_perm}I", blob))
+
+    def _representative(self, cluster_id: str) -> Optional[List[int]]:
+        row = self._conn.execute(
+            "SELECT signature FROM clusters WHERE id = ?", (cluster_id,)
+        ).fetchone()
+        return self._unpack(row[0]) if row else None
+
+    def add(self, status_id: str, text: str) -> Optional[str]:
+        """
+        Index a status and return the ID of the cluster it belongs to.
+
+        :param status_id: Status ID, used as the cluster ID if a new cluster is created
+        :param text: Normalized status text (see normalize_content)
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        keys = self._band_keys(signature)
+        cluster_id: Optional[str] = None
+        checked = set()
+        for band, key in enumerate(keys):
+            row = self._conn.execute(
+                "SELECT cluster_id FROM buckets WHERE band = ? AND key = ?", (band, key)
+            ).fetchone()
+            if row is None or row[0] in checked:
+                continue
+            checked.add(row[0])
+            representative = self._representative(row[0])
+            if representative and self._similarity(signature, representative) >= self.threshold:
+                cluster_id = row[0]
+                break
+
+        if cluster_id is None:
+            cluster_id = status_id
+            if self._representative(status_id) is not None:
+                # An edited status seen again keeps its cluster; its stored
+                # representative and buckets stay as they are.
+                return cluster_id
+            self._conn.execute(
+                "INSERT INTO clusters (id, signature) VALUES (?, ?)",
+                (cluster_id, self._pack(signature)),
+            )
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO buckets (band, key, cluster_id) VALUES (?, ?, ?)",
+            [(band, key, cluster_id) for band, key in enumerate(keys)],
+        )
+        return cluster_id
+
+    def assign(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a nearDuplicateOf cluster ID to a formatted post or reply in place.
+        """
+        status_id = status.get("id")
+        text = normalize_content(status.get("content"))
+        status["nearDuplicateOf"] = self.add(str(status_id), text) if status_id else None
+        return status
+
+    def _params(self) -> Dict[str, Any]:
+        # Only parameters that shape the stored signatures and buckets; threshold
+        # and min_tokens can change between runs on the same index.
+        return {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+        }
+
+    def save(self) -> None:
+        """
+        Commit statuses indexed since the last save.
+        """
+        self._conn.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database; uncommitted changes are discarded.
+        """
+        self._conn.close()